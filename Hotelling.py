@@ -1,117 +1,240 @@
-import random
+import argparse
 import math
+import numpy as np
 
-firm_names = ["Alpha", "Beta"]
-firm_positions = []
-firm_prices = []
-
-while len(firm_positions) < 2:
-    try:
-        firm_name = firm_names[len(firm_positions)]
-        pos = float(input(f"Enter position for Firm {firm_name} (0-1) "))
-
-        if 0 <= pos <= 1:
-            firm_positions.append(pos)
-        else:
-            print("Positions must be between 0 and 1")
-    except ValueError:
-        print("Enter a valid number")
-
-while len(firm_prices) < 2:
-    try:
-        firm_name = firm_names[len(firm_prices)]
-        price = int(input(f"Enter price for Firm {firm_name} "))
-
-        if 0 <= price:
-            firm_prices.append(price)
-        else:
-            print("Enter a positive number ")
-    except ValueError:
-        print("Enter a valid number")
-
-transport_cost = int(input("Transport Cost? "))
-line_length = 1
-num_simulations = int(input("Number of simulations? "))
-
-while True:
-    num_consumers = int(input("How many Consumers? "))
-    if num_consumers > 0:
-        break
-    else:
-        print("Enter a positive Number")
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+SIMULATION_BLOCK = 1024
+
+# Price range the new entrant is allowed to pick from
+PRICE_MIN = 5
+PRICE_MAX = 20
+
+# One PCG64 generator for every draw in the module, reseeded by set_seed
+rng = np.random.default_rng()
 
-def consumer_choice(consumer_position, firm_positions, firm_prices, transport_cost):
-    """Finds the firm with the lowest total cost for a given consumer, returns index of chosen firm"""
-    costs = []
-    for i in range(len(firm_positions)):
-        distance = abs(consumer_position - firm_positions[i])
-        total_cost = firm_prices[i] + (distance * transport_cost)
-        costs.append(total_cost)
-    return costs.index(min(costs))
+def set_seed(seed):
+    """Reseeds the module's random generator so runs can be reproduced."""
+    global rng
+    rng = np.random.default_rng(seed)
 
 def generate_consumers(num_consumers):
     """Populates a 0-1 number line with consumers along it."""
-    consumers = []
-    for i in range(num_consumers):
-        position = random.uniform(0, 1)
-        consumers.append(position)
-    return consumers
-consumers = generate_consumers(num_consumers)
+    return rng.uniform(0, 1, num_consumers)
 
 def simulate_market(consumers, firm_positions, firm_prices, transport_cost):
-    """Assigns consumers to firms based on their choice, populating the firm_customers list, assumes firms have no capacity restrictions."""
-    firm_customers = [0] * len(firm_positions)
+    """Assigns every consumer to the firm with the lowest total cost (price + distance * transport cost) and counts customers per firm, assumes firms have no capacity restrictions."""
+    firm_positions = np.asarray(firm_positions, dtype=float)
+    firm_prices = np.asarray(firm_prices, dtype=float)
 
-    for consumer_pos in consumers:
-        chosen_firm = consumer_choice(consumer_pos, firm_positions, firm_prices, transport_cost)
-        firm_customers[chosen_firm] += 1
-    return firm_customers
+    costs = firm_prices + transport_cost * np.abs(consumers[:, None] - firm_positions)
+    choices = costs.argmin(axis=1)
+    return np.bincount(choices, minlength=len(firm_positions))
 
-def calculate_firm_profit(firm_positions, firm_prices, consumers, transport_cost):
-    """Find firm profits (customers * Price) and assumes no production costs."""
+def simulate_and_profit(firm_positions, firm_prices, consumers, transport_cost):
+    """Simulates the market once and returns customers per firm and firm profits (customers * Price), assumes no production costs."""
     customers_per_firm = simulate_market(consumers, firm_positions, firm_prices, transport_cost)
-
-    firm_profits = []
-    for i in range(len(firm_positions)):
-        profit = customers_per_firm[i] * firm_prices[i]
-        firm_profits.append(profit)
-    return firm_profits
-
-
-def monte_carlo_optimization(existing_positions, existing_prices, consumers, transport_cost, num_simulations):
-    """Finds the best position and price for a new entrant to the market."""
+    return customers_per_firm, customers_per_firm * np.asarray(firm_prices, dtype=float)
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def mc_sweep(consumers, pos0, pos1, pr0, pr1, transport_cost, new_positions, new_prices):
+        """Compiled sweep returning the new entrant's profit for every simulation, simulations are split across cores."""
+        num_simulations = new_positions.shape[0]
+        profits = np.zeros(num_simulations)
+
+        for s in prange(num_simulations):
+            new_pos = new_positions[s]
+            new_price = new_prices[s]
+            customers = 0
+            for c in range(consumers.shape[0]):
+                x = consumers[c]
+                cost0 = pr0 + transport_cost * abs(x - pos0)
+                cost1 = pr1 + transport_cost * abs(x - pos1)
+                cost2 = new_price + transport_cost * abs(x - new_pos)
+                # ties go to the existing firms, same as argmin
+                if cost2 < cost0 and cost2 < cost1:
+                    customers += 1
+            profits[s] = customers * new_price
+        return profits
+
+def monte_carlo_optimization(existing_positions, existing_prices, consumers, transport_cost, num_simulations, block_size=SIMULATION_BLOCK):
+    """Finds the best position and price for a new entrant to the market, evaluating the simulations in cache-sized blocks."""
     best_profit = 0
     best_position = 0
-    best_price = 0 
-
-    for simulation in range(num_simulations):
-        new_position = random.uniform(0, 1)
-        new_price = random.uniform (5, 20)
-
-        test_positions = existing_positions + [new_position]
-        test_prices = existing_prices + [new_price]
-
-        all_profits = calculate_firm_profit(test_positions, test_prices, consumers, transport_cost)
-        new_firm_profit = all_profits[2]
-
-        if new_firm_profit > best_profit:
-            best_profit = new_firm_profit
-            best_position = new_position
-            best_price = new_price
+    best_price = 0
+
+    # Draw every trial up front in two vectorized calls
+    new_positions = rng.uniform(0, 1, num_simulations)
+    new_prices = rng.uniform(PRICE_MIN, PRICE_MAX, num_simulations)
+
+    # With no simulations there's nothing to argmax, the block loop below returns the zero default
+    if NUMBA_AVAILABLE and num_simulations > 0:
+        profits = mc_sweep(np.asarray(consumers, dtype=np.float64),
+                           float(existing_positions[0]), float(existing_positions[1]),
+                           float(existing_prices[0]), float(existing_prices[1]),
+                           float(transport_cost), new_positions, new_prices)
+        best = profits.argmax()
+        if profits[best] > best_profit:
+            return new_positions[best], new_prices[best], profits[best]
+        return best_position, best_price, best_profit
+
+    existing_positions = np.asarray(existing_positions, dtype=np.float32)
+    existing_prices = np.asarray(existing_prices, dtype=np.float32)
+    consumers = np.asarray(consumers).astype(np.float32)
+
+    for start in range(0, num_simulations, block_size):
+        block_positions = new_positions[start:start + block_size]
+        block_prices = new_prices[start:start + block_size]
+        block_len = len(block_positions)
+
+        # (block, 3) positions and prices, the new entrant is always firm index 2
+        positions = np.empty((block_len, 3), dtype=np.float32)
+        positions[:, :2] = existing_positions
+        positions[:, 2] = block_positions
+        prices = np.empty((block_len, 3), dtype=np.float32)
+        prices[:, :2] = existing_prices
+        prices[:, 2] = block_prices
+
+        # (block, consumers, 3) cost tensor
+        costs = prices[:, None, :] + np.float32(transport_cost) * np.abs(consumers[None, :, None] - positions[:, None, :])
+        choices = costs.argmin(axis=2)
+        new_firm_customers = (choices == 2).sum(axis=1)
+        # profits stay float64 so the float32 costs don't leak into the result
+        new_firm_profits = new_firm_customers * block_prices
+
+        best = new_firm_profits.argmax()
+        if new_firm_profits[best] > best_profit:
+            best_profit = new_firm_profits[best]
+            best_position = block_positions[best]
+            best_price = block_prices[best]
     return best_position, best_price, best_profit
 
 
 
-optimal_position, optimal_price, optimal_profit = monte_carlo_optimization(firm_positions, firm_prices, consumers, transport_cost, num_simulations)
-final_positions = firm_positions + [optimal_position]
-final_prices = firm_prices + [optimal_price] 
-
-customers_per_firm = simulate_market(consumers, final_positions, final_prices, transport_cost)
-firm_profit = calculate_firm_profit(final_positions, final_prices, consumers, transport_cost)
-
-print(f"Optimal 3rd Firm Position: {optimal_position}")
-print(f"Optimal 3rd Firm Price: {optimal_price}")
-print(f"Optimal 3rd Firm Profit: {optimal_profit}")
-print(f"Firm Alpha Profit: {firm_profit[0]}")
-print(f"Firm Beta Profit: {firm_profit[1]}")
-print(f"Firm Gamma Profit: {firm_profit[2]}")
\ No newline at end of file
+def exact_optimization(existing_positions, existing_prices, consumers, transport_cost):
+    """Finds the best position and price for a new entrant against the actual consumers, returns the profit from the run of consumers it wins. Needs transport_cost >= 0."""
+    # Sorted by position, the entrant always wins a contiguous run of consumers j..k. Winning both ends wins the
+    # middle, and the most it can charge for that is (a[j] + b[k]) / 2, at the point between them where both ends
+    # are indifferent. Here a = m + t*c and b = m - t*c, with m each consumer's cheapest existing option.
+    t = transport_cost
+    if t < 0:
+        raise ValueError("exact_optimization needs a non-negative transport cost, use monte_carlo_optimization instead")
+    c = np.sort(np.asarray(consumers, dtype=float))
+    if len(c) == 0:
+        return 0, 0, 0
+    m = np.min(np.asarray(existing_prices, dtype=float) + t * np.abs(c[:, None] - np.asarray(existing_positions, dtype=float)), axis=1)
+    # m changes by at most t per unit of distance, so a never decreases and b never increases (accumulate irons out rounding)
+    a = np.maximum.accumulate(m + t * c)
+    b = np.minimum.accumulate(m - t * c)
+    neg_b = -b
+    idx = np.arange(len(c))
+    # Ties go to the existing firms, so a run is charged just under its limit
+    margin = 1e-9
+
+    best_profit, best_j, best_k = 0, -1, -1
+
+    # Runs that could be sold above PRICE_MAX are sold at PRICE_MAX, so only the longest one matters
+    last_k = np.searchsorted(neg_b, a - 2 * (PRICE_MAX + margin), side='right') - 1
+    run_lengths = last_k - idx + 1
+    j = run_lengths.argmax()
+    if run_lengths[j] > 0:
+        best_profit, best_j, best_k = PRICE_MAX * run_lengths[j], j, last_k[j]
+
+    # The rest are sold just under (a[j] + b[k]) / 2, between PRICE_MIN and PRICE_MAX. Since a and b are monotone the
+    # best k never moves left as j moves right, so divide and conquer finds every j's best k in O(C log C)
+    lo = np.maximum(idx, np.searchsorted(neg_b, a - 2 * (PRICE_MAX + margin), side='right'))
+    hi = np.searchsorted(neg_b, a - 2 * (PRICE_MIN + margin), side='right') - 1
+    rows = idx[lo <= hi]
+    stack = [(0, len(rows) - 1, 0, len(c) - 1)]
+    while stack:
+        r0, r1, k0, k1 = stack.pop()
+        if r0 > r1:
+            continue
+        mid = (r0 + r1) // 2
+        j = rows[mid]
+        start, stop = max(k0, lo[j]), min(k1, hi[j])
+        if start > stop:
+            start, stop = lo[j], hi[j]
+        ks = np.arange(start, stop + 1)
+        profits = (ks - j + 1) * ((a[j] + b[ks]) / 2 - margin)
+        i = profits.argmax()
+        k = start + i
+        if profits[i] > best_profit:
+            best_profit, best_j, best_k = profits[i], j, k
+        stack.append((r0, mid - 1, k0, k))
+        stack.append((mid + 1, r1, k, k1))
+
+    if best_j < 0:
+        return 0, 0, 0
+
+    if t > 0:
+        position = min(max((a[best_j] - b[best_k]) / (2 * t), c[best_j]), c[best_k])
+    else:
+        position = c[best_j]
+    price = min((a[best_j] + b[best_k]) / 2 - margin, PRICE_MAX)
+    return position, price, best_profit
+
+def run(firm_positions, firm_prices, transport_cost, num_consumers, num_simulations, seed=None, method="exact"):
+    """Generates consumers and finds the optimal 3rd firm (exactly, or by Monte Carlo sampling with method="mc"), returns its position, price, profit and every firm's profit."""
+    if seed is not None:
+        set_seed(seed)
+    firm_positions = list(firm_positions)
+    firm_prices = list(firm_prices)
+    consumers = generate_consumers(num_consumers)
+
+    if method == "mc":
+        optimal_position, optimal_price, optimal_profit = monte_carlo_optimization(firm_positions, firm_prices, consumers, transport_cost, num_simulations)
+    else:
+        optimal_position, optimal_price, optimal_profit = exact_optimization(firm_positions, firm_prices, consumers, transport_cost)
+    final_positions = firm_positions + [optimal_position]
+    final_prices = firm_prices + [optimal_price]
+
+    _, firm_profit = simulate_and_profit(final_positions, final_prices, consumers, transport_cost)
+    # Report what the optimum actually earns in the simulated market
+    optimal_profit = firm_profit[2]
+    return optimal_position, optimal_price, optimal_profit, firm_profit
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the best position and price for a 3rd firm on a Hotelling line.")
+    parser.add_argument("--pos-alpha", type=float, required=True, help="Position for Firm Alpha (0-1)")
+    parser.add_argument("--pos-beta", type=float, required=True, help="Position for Firm Beta (0-1)")
+    parser.add_argument("--price-alpha", type=int, required=True, help="Price for Firm Alpha")
+    parser.add_argument("--price-beta", type=int, required=True, help="Price for Firm Beta")
+    parser.add_argument("--tc", type=int, required=True, help="Transport cost")
+    parser.add_argument("--n-consumers", type=int, required=True, help="How many consumers")
+    parser.add_argument("--n-sims", type=int, default=10000, help="Number of simulations (only used with --method mc)")
+    parser.add_argument("--method", choices=["exact", "mc"], default="exact", help="Solve for the optimum exactly, or sample it by Monte Carlo for comparison")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+    args = parser.parse_args()
+
+    firm_positions = [args.pos_alpha, args.pos_beta]
+    firm_prices = [args.price_alpha, args.price_beta]
+
+    if not all(0 <= pos <= 1 for pos in firm_positions):
+        parser.error("Positions must be between 0 and 1")
+    if not all(0 <= price for price in firm_prices):
+        parser.error("Prices must be positive numbers")
+    if args.tc < 0:
+        parser.error("Transport cost can't be negative")
+    if args.n_consumers <= 0:
+        parser.error("Number of consumers must be a positive number")
+    if args.n_sims < 0:
+        parser.error("Number of simulations can't be negative")
+
+    optimal_position, optimal_price, optimal_profit, firm_profit = run(firm_positions, firm_prices, args.tc, args.n_consumers, args.n_sims, seed=args.seed, method=args.method)
+
+    print(f"Optimal 3rd Firm Position: {optimal_position}")
+    print(f"Optimal 3rd Firm Price: {optimal_price}")
+    print(f"Optimal 3rd Firm Profit: {optimal_profit}")
+    print(f"Firm Alpha Profit: {firm_profit[0]}")
+    print(f"Firm Beta Profit: {firm_profit[1]}")
+    print(f"Firm Gamma Profit: {firm_profit[2]}")
+
+if __name__ == "__main__":
+    main()
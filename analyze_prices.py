@@ -1,28 +1,67 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
-def load_and_clean_data(filepath='data/caiso_prices.csv'):
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+def load_and_clean_data(filepath='data/caiso_prices.parquet'):
     """
     Load the CAISO data and clean it up
     """
-    df = pd.read_csv(filepath)
+    columns = ['INTERVALSTARTTIME_GMT', 'LMP_TYPE', 'MW']
     
-    # Convert timestamp to datetime
-    df['timestamp'] = pd.to_datetime(df['INTERVALSTARTTIME_GMT'])
+    if POLARS_AVAILABLE:
+        # Lazy scan so the column selection and filter run as one query
+        scan = pl.scan_parquet(filepath) if filepath.endswith('.parquet') else pl.scan_csv(filepath)
+        lmp_data = (
+            scan.select(columns)
+            # Filter for just total LMP prices (not components)
+            .filter(pl.col('LMP_TYPE') == 'LMP')
+            .with_columns(pl.col('INTERVALSTARTTIME_GMT').str.to_datetime(time_zone='UTC').alias('timestamp'))
+            .with_columns([
+                # Rename MW column to price for clarity
+                pl.col('MW').alias('price'),
+                # Extract useful time features, matching pandas' types (dayofweek is 0 = Monday, date becomes datetime64)
+                pl.col('timestamp').dt.date().alias('date'),
+                pl.col('timestamp').dt.hour().cast(pl.Int32).alias('hour'),
+                (pl.col('timestamp').dt.weekday() - 1).cast(pl.Int32).alias('day_of_week'),
+            ])
+            .collect()
+        )
+        # CAISO files usually come sorted already, so only sort when they don't
+        if not lmp_data['timestamp'].is_sorted():
+            lmp_data = lmp_data.sort('timestamp')
+        # Everything downstream is pandas/matplotlib, so convert once here
+        return lmp_data.to_pandas()
+    
+    if filepath.endswith('.parquet'):
+        # Only read the columns we use and filter for just total LMP prices (not components) in the reader
+        lmp_data = pd.read_parquet(filepath, columns=columns, filters=[('LMP_TYPE', '==', 'LMP')])
+    else:
+        df = pd.read_csv(filepath, usecols=columns)
+        # Filter for just total LMP prices (not components)
+        lmp_data = df[df['LMP_TYPE'] == 'LMP'].copy()
     
-    # Filter for just total LMP prices (not components)
-    lmp_data = df[df['LMP_TYPE'] == 'LMP'].copy()
+    # Convert timestamp to datetime
+    lmp_data['timestamp'] = pd.to_datetime(lmp_data['INTERVALSTARTTIME_GMT'])
     
     # Rename MW column to price for clarity
     lmp_data['price'] = lmp_data['MW']
     
     # Extract useful time features
-    lmp_data['date'] = lmp_data['timestamp'].dt.date
+    # Day as native datetime64 (UTC) rather than python date objects
+    lmp_data['date'] = lmp_data['timestamp'].values.astype('datetime64[D]')
     lmp_data['hour'] = lmp_data['timestamp'].dt.hour
     lmp_data['day_of_week'] = lmp_data['timestamp'].dt.dayofweek
     
-    # Sort by timestamp
-    lmp_data = lmp_data.sort_values('timestamp').reset_index(drop=True)
+    # Sort by timestamp, skipped when the file is already in order
+    if not lmp_data['timestamp'].is_monotonic_increasing:
+        lmp_data = lmp_data.sort_values('timestamp', kind='mergesort')
+    lmp_data = lmp_data.reset_index(drop=True)
     
     return lmp_data
 
@@ -41,106 +80,132 @@ def calculate_statistics(df):
     
     return stats
 
-def plot_time_series(df):
+def precompute_aggregates(df):
+    """
+    Compute the shared aggregates once so the plots/analyses don't each regroup the data
+    """
+    hourly = df.groupby('hour', observed=True, sort=False)['price'].agg(['mean', 'std', 'min', 'max']).sort_index()
+    
+    # Hour x date average price grid for the heatmap, hours are 0-23 and dates are a dense range
+    # so the cells can be summed straight into a flat (24 * n_dates) array
+    days = df['date'].to_numpy().astype('datetime64[D]')
+    min_day = days.min()
+    n_dates = int((days.max() - min_day).astype(np.int64)) + 1
+    day_idx = (days - min_day).astype(np.int64)
+    flat = df['hour'].to_numpy().astype(np.int64) * n_dates + day_idx
+    
+    sums = np.bincount(flat, weights=df['price'].to_numpy(), minlength=24 * n_dates).reshape(24, n_dates)
+    counts = np.bincount(flat, minlength=24 * n_dates).reshape(24, n_dates)
+    # Cells without data stay NaN, same as pivot_table
+    means = np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+    daily = pd.DataFrame(means, index=pd.RangeIndex(24, name='hour'),
+                         columns=pd.date_range(pd.Timestamp(min_day), periods=n_dates, freq='D', name='date'))
+    
+    return {'hourly': hourly, 'daily': daily}
+
+def plot_time_series(df, ax):
     """
     Plot prices over time
     """
-    plt.figure(figsize=(14, 6))
-    plt.plot(df['timestamp'], df['price'], linewidth=1, color='#2563eb')
-    plt.title('CAISO Day-Ahead LMP Prices - January 2024', fontsize=14, fontweight='bold')
-    plt.xlabel('Date')
-    plt.ylabel('Price ($/MWh)')
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('plots/price_timeseries.png', dpi=300, bbox_inches='tight')
+    fig = ax.figure
+    ax.clear()
+    fig.set_size_inches(14, 6)
+    ax.plot(df['timestamp'], df['price'], linewidth=1, color='#2563eb')
+    ax.set_title('CAISO Day-Ahead LMP Prices - January 2024', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Price ($/MWh)')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig('plots/price_timeseries.png', dpi=300, bbox_inches='tight')
     print("Saved: plots/price_timeseries.png")
-    plt.close()
 
-def plot_hourly_pattern(df):
+def plot_hourly_pattern(hourly_stats, ax):
     """
     Plot average price by hour of day
     """
-    hourly_avg = df.groupby('hour')['price'].agg(['mean', 'std']).reset_index()
-    
-    plt.figure(figsize=(12, 6))
-    plt.bar(hourly_avg['hour'], hourly_avg['mean'], color='#10b981', alpha=0.7, edgecolor='black')
-    plt.errorbar(hourly_avg['hour'], hourly_avg['mean'], yerr=hourly_avg['std'], 
-                 fmt='none', color='black', capsize=3, alpha=0.5)
-    plt.title('Average Price by Hour of Day', fontsize=14, fontweight='bold')
-    plt.xlabel('Hour of Day')
-    plt.ylabel('Average Price ($/MWh)')
-    plt.xticks(range(0, 24))
-    plt.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
-    plt.savefig('plots/hourly_pattern.png', dpi=300, bbox_inches='tight')
+    hourly_avg = hourly_stats.reset_index()
+    
+    fig = ax.figure
+    ax.clear()
+    fig.set_size_inches(12, 6)
+    ax.bar(hourly_avg['hour'], hourly_avg['mean'], color='#10b981', alpha=0.7, edgecolor='black')
+    ax.errorbar(hourly_avg['hour'], hourly_avg['mean'], yerr=hourly_avg['std'], 
+                fmt='none', color='black', capsize=3, alpha=0.5)
+    ax.set_title('Average Price by Hour of Day', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Hour of Day')
+    ax.set_ylabel('Average Price ($/MWh)')
+    ax.set_xticks(range(0, 24))
+    ax.grid(True, alpha=0.3, axis='y')
+    fig.tight_layout()
+    fig.savefig('plots/hourly_pattern.png', dpi=300, bbox_inches='tight')
     print("Saved: plots/hourly_pattern.png")
-    plt.close()
 
-def plot_price_distribution(df):
+def plot_price_distribution(df, ax):
     """
     Plot histogram of prices
     """
-    plt.figure(figsize=(10, 6))
-    plt.hist(df['price'], bins=50, color='#8b5cf6', alpha=0.7, edgecolor='black')
-    plt.axvline(df['price'].mean(), color='red', linestyle='--', linewidth=2, label=f'Mean: ${df["price"].mean():.2f}')
-    plt.axvline(df['price'].median(), color='green', linestyle='--', linewidth=2, label=f'Median: ${df["price"].median():.2f}')
-    plt.title('Price Distribution', fontsize=14, fontweight='bold')
-    plt.xlabel('Price ($/MWh)')
-    plt.ylabel('Frequency')
-    plt.legend()
-    plt.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
-    plt.savefig('plots/price_distribution.png', dpi=300, bbox_inches='tight')
+    fig = ax.figure
+    ax.clear()
+    fig.set_size_inches(10, 6)
+    ax.hist(df['price'], bins=50, color='#8b5cf6', alpha=0.7, edgecolor='black')
+    ax.axvline(df['price'].mean(), color='red', linestyle='--', linewidth=2, label=f'Mean: ${df["price"].mean():.2f}')
+    ax.axvline(df['price'].median(), color='green', linestyle='--', linewidth=2, label=f'Median: ${df["price"].median():.2f}')
+    ax.set_title('Price Distribution', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Price ($/MWh)')
+    ax.set_ylabel('Frequency')
+    ax.legend()
+    ax.grid(True, alpha=0.3, axis='y')
+    fig.tight_layout()
+    fig.savefig('plots/price_distribution.png', dpi=300, bbox_inches='tight')
     print("Saved: plots/price_distribution.png")
-    plt.close()
 
-def plot_daily_heatmap(df):
+def plot_daily_heatmap(pivot, ax):
     """
     Create a heatmap showing prices by day and hour
     """
-    # Create pivot table
-    pivot = df.pivot_table(values='price', index='hour', columns='date', aggfunc='mean')
-    
-    plt.figure(figsize=(14, 8))
-    im = plt.imshow(pivot.values, aspect='auto', cmap='RdYlGn_r', interpolation='nearest')
-    plt.colorbar(im, label='Price ($/MWh)')
-    plt.title('Price Heatmap: Hour vs Day', fontsize=14, fontweight='bold')
-    plt.ylabel('Hour of Day')
-    plt.xlabel('Date')
-    plt.yticks(range(24), range(24))
+    fig = ax.figure
+    ax.clear()
+    fig.set_size_inches(14, 8)
+    im = ax.imshow(pivot.values, aspect='auto', cmap='RdYlGn_r', interpolation='nearest')
+    cbar = fig.colorbar(im, ax=ax, label='Price ($/MWh)')
+    ax.set_title('Price Heatmap: Hour vs Day', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Hour of Day')
+    ax.set_xlabel('Date')
+    ax.set_yticks(range(24), range(24))
     
     # Show every 3rd date on x-axis
-    dates = [str(d) for d in pivot.columns]
-    plt.xticks(range(0, len(dates), 3), dates[::3], rotation=45)
+    tick_labels = pd.DatetimeIndex(pivot.columns).strftime('%Y-%m-%d').to_numpy()
+    ax.set_xticks(range(0, len(tick_labels), 3), tick_labels[::3], rotation=45)
     
-    plt.tight_layout()
-    plt.savefig('plots/price_heatmap.png', dpi=300, bbox_inches='tight')
+    fig.tight_layout()
+    fig.savefig('plots/price_heatmap.png', dpi=300, bbox_inches='tight')
     print("Saved: plots/price_heatmap.png")
-    plt.close()
+    # Take the colorbar back off so the figure can be reused
+    cbar.remove()
 
 def investigate_price_spike(df):
     """
     looking @ jan 13-17 price spike
     """
-    spike_data = df[(df['date'] >= pd.to_datetime('2024-01-13').date()) & 
-                    (df['date'] <= pd.to_datetime('2024-01-17').date())]
-    normal_data = df[~((df['date'] >= pd.to_datetime('2024-01-13').date()) & 
-                       (df['date'] <= pd.to_datetime('2024-01-17').date()))]
+    is_spike = df['date'].between(pd.Timestamp('2024-01-13'), pd.Timestamp('2024-01-17'), inclusive='both')
+    spike_data = df.loc[is_spike]
+    spike_stats = spike_data['price'].agg(['mean', 'min', 'max'])
+    normal_stats = df.loc[~is_spike, 'price'].agg(['mean', 'min', 'max'])
     print("\n" + "="*60)
     print("Price Spike Analysis: Jan 13-17")
     print("="*60)
 
     print("\nSpike Period Stats:")
-    print(f" Average Price: ${spike_data['price'].mean():.2f}/MWh")
-    print(f" Max Price: ${spike_data['price'].max():.2f}/MWh")
-    print(f" Min Price: ${spike_data['price'].min():.2f}/MWh")
+    print(f" Average Price: ${spike_stats['mean']:.2f}/MWh")
+    print(f" Max Price: ${spike_stats['max']:.2f}/MWh")
+    print(f" Min Price: ${spike_stats['min']:.2f}/MWh")
 
     print("\nRest of Month Stats:")
-    print(f" Average Price: ${normal_data['price'].mean():.2f}/MWh")
-    print(f" Max Price: ${normal_data['price'].max():.2f}/MWh")
-    print(f" Min Price: ${normal_data['price'].min():.2f}/MWh")
+    print(f" Average Price: ${normal_stats['mean']:.2f}/MWh")
+    print(f" Max Price: ${normal_stats['max']:.2f}/MWh")
+    print(f" Min Price: ${normal_stats['min']:.2f}/MWh")
 
-    print(f"\nPrice Increase: {((spike_data['price'].mean() / normal_data['price'].mean() - 1) *100):.1f}%")
+    print(f"\nPrice Increase: {((spike_stats['mean'] / normal_stats['mean'] - 1) *100):.1f}%")
 
     # Find the highest price hour
     max_price_row = spike_data.loc[spike_data['price'].idxmax()]
@@ -157,12 +222,13 @@ def investigate_price_spike(df):
     axes[0].set_title('Price Spike Detail: Jan 13-14, 2024', fontsize = 12, fontweight = 'bold')
     axes[0].set_ylabel('Price ($/MWh)')
     axes[0].grid(True, alpha = 0.3)
-    axes[0].axhline(spike_data['price'].mean(), color = 'orange', linestyle='--', label=f'Spike Avg: ${spike_data["price"].mean():.2f}')
+    axes[0].axhline(spike_stats['mean'], color = 'orange', linestyle='--', label=f'Spike Avg: ${spike_stats["mean"]:.2f}')
     axes[0].legend()
 
     #hourly compare
-    spike_hourly = spike_data.groupby('hour')['price'].mean()
-    normal_hourly = normal_data.groupby('hour')['price'].mean()
+    hourly = df.groupby([is_spike.rename('is_spike'), 'hour'])['price'].mean().unstack(0)
+    spike_hourly = hourly[True]
+    normal_hourly = hourly[False]
 
     x = range(24)
     width = .4
@@ -180,7 +246,7 @@ def investigate_price_spike(df):
     print("\nSaved: plots/spike_analysis.png")
     plt.close()
 
-def analyze_evening_valley(df):
+def analyze_evening_valley(hourly_stats):
     """
     Analyze why 9 PM has lowest prices
     """
@@ -188,8 +254,7 @@ def analyze_evening_valley(df):
     print("EVENING PRICE VALLEY ANALYSIS")
     print("="*60)
     
-    # Calculate average by hour
-    hourly_stats = df.groupby('hour')['price'].agg(['mean', 'min', 'max', 'std']).reset_index()
+    hourly_stats = hourly_stats.reset_index()
     
     # Find cheapest hours
     cheapest_3 = hourly_stats.nsmallest(3, 'mean')
@@ -229,15 +294,20 @@ if __name__ == "__main__":
     for key, value in stats.items():
         print(f"  {key}: ${value:.2f}")
     
-    # Create all plots
+    aggregates = precompute_aggregates(df)
+    
+    # Create all plots, reusing one figure instead of building a new one per plot
     print("\nGenerating plots...")
+    plt.ioff()
+    fig, ax = plt.subplots(figsize=(14, 8))
     #generic plots
-    plot_time_series(df)
-    plot_hourly_pattern(df)
-    plot_price_distribution(df)
-    plot_daily_heatmap(df)
+    plot_time_series(df, ax)
+    plot_hourly_pattern(aggregates['hourly'], ax)
+    plot_price_distribution(df, ax)
+    plot_daily_heatmap(aggregates['daily'], ax)
+    plt.close(fig)
     #Investigative Plots
     #investigate_price_spike(df)
-    #analyze_evening_valley(df)
+    #analyze_evening_valley(aggregates['hourly'])
     
     print("\nAll plots saved to 'plots/' directory!")
\ No newline at end of file
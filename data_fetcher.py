@@ -1,5 +1,8 @@
 import requests
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
 from datetime import datetime, timedelta
 import zipfile
 import io
@@ -41,47 +44,64 @@ def fetch_caiso_prices(start_date, end_date, node='TH_NP15_GEN-APND', verbose=Tr
 
 import xml.etree.ElementTree as ET
 
-def fetch_multiple_months(start_date, end_date, node='TH_NP15_GEN-APND'):
+def fetch_multiple_months(start_date, end_date, node='TH_NP15_GEN-APND', max_workers=4, request_interval=2):
     from datetime import timedelta
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
     import time
 
-    all_data = []
+    # Build every chunk up front so they can be fetched concurrently
+    chunks = []
     current_start = start_date
-    chunk_num = 0
-
     while current_start < end_date:
-        chunk_num += 1
         current_end = min(current_start + timedelta(days=30), end_date)
+        chunks.append((current_start.strftime('%Y%m%d'), current_end.strftime('%Y%m%d')))
+        current_start = current_end + timedelta(days=1)
 
-        start_str = current_start.strftime('%Y%m%d')
-        end_str = current_end.strftime('%Y%m%d')
+    #Space out request starts to avoid rate-limiting
+    rate_lock = threading.Lock()
+    last_request = [0.0]
 
-        print(f"\n[Chunk {chunk_num}] Fetching: {start_str} to {end_str}")
-        
-        data = fetch_caiso_prices(start_str, end_str, node, verbose=False)
+    def fetch_chunk(chunk):
+        start_str, end_str = chunk
+        with rate_lock:
+            wait = last_request[0] + request_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            last_request[0] = time.monotonic()
+        return fetch_caiso_prices(start_str, end_str, node, verbose=False)
 
-        if data:
-            df_chunk = extract_and_parse_zip(data)
-            all_data.append(df_chunk)
-            print(f"[Chunk {chunk_num}] success - {len(df_chunk)} records")
-        else:
-            print(f"[Chunk {chunk_num}] FAILED")
+    all_data = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(fetch_chunk, chunks)
 
-        current_start = current_end + timedelta(days=1)
+        for chunk_num, ((start_str, end_str), data) in enumerate(zip(chunks, results), start=1):
+            print(f"\n[Chunk {chunk_num}] Fetched: {start_str} to {end_str}")
+
+            if data:
+                # Keep chunks as arrow tables and only build the pandas frame once at the end
+                table_chunk = extract_zip_table(data)
+                all_data.append(table_chunk)
+                print(f"[Chunk {chunk_num}] success - {table_chunk.num_rows} records")
+            else:
+                print(f"[Chunk {chunk_num}] FAILED")
 
-        #Delay to avoid rate-limiting
-        if current_start < end_date:
-            time.sleep(2)
     if all_data:
-        combined_df = pd.concat(all_data, ignore_index=True)
+        # Each chunk's types are inferred separately, so let mismatched numeric types widen like pd.concat did
+        combined_table = pa.concat_tables(all_data, promote_options='permissive')
+        # Drop every other reference to the chunk buffers so self_destruct can actually free them
+        all_data.clear()
+        del table_chunk
+        # self_destruct frees the arrow buffers as they're converted to keep peak memory down
+        combined_df = combined_table.to_pandas(split_blocks=True, self_destruct=True)
         print(f"Total records fetched: {len(combined_df)}")
         return combined_df
     else:
         return None
 
-def extract_and_parse_zip(zip_content):
+def extract_zip_table(zip_content):
     """
-    Extract CSV from ZIP and load into pandas DataFrame
+    Extract CSV from ZIP and load into a pyarrow Table (parsed with pyarrow's multi-threaded CSV reader)
     """
     # Open the ZIP file from memory
     with zipfile.ZipFile(io.BytesIO(zip_content)) as z:
@@ -91,32 +111,60 @@ def extract_and_parse_zip(zip_content):
         data_file = z.namelist()[0]
         print(f"Reading file: {data_file}")
         
-        # Read it into pandas
+        # Date/time columns are kept as strings like pandas did, they're converted later on
         with z.open(data_file) as f:
-            df = pd.read_csv(f)
+            table = pv.read_csv(f, parse_options=pv.ParseOptions(delimiter=','),
+                                convert_options=pv.ConvertOptions(column_types={
+                                    'INTERVALSTARTTIME_GMT': pa.string(),
+                                    'INTERVALENDTIME_GMT': pa.string(),
+                                    'OPR_DT': pa.string(),
+                                    # Prices can look like ints in one chunk and floats in another
+                                    'MW': pa.float64(),
+                                }))
             
-    return df
+    return table
+
+def extract_and_parse_zip(zip_content):
+    """
+    Extract CSV from ZIP and load into pandas DataFrame
+    """
+    return extract_zip_table(zip_content).to_pandas()
 
 def save_to_csv(df, filename='caiso_prices.csv'):
     """
-    Save DataFrame to CSV file
+    Save DataFrame to CSV file (save_to_parquet is preferred, this is kept for tools that need CSV)
     """
     # Create data directory if it doesn't exist
     import os
     os.makedirs('data', exist_ok=True)
     
     filepath = f'data/{filename}'
-    df.to_csv(filepath, index=False)
+    # pyarrow's writer encodes in parallel and streams batches to the file
+    # It quotes the header and string values, and writes whole-number floats as 2 rather than 2.0, both read back the same
+    pv.write_csv(pa.Table.from_pandas(df, preserve_index=False), filepath,
+                 write_options=pv.WriteOptions(batch_size=65536))
     print(f"Data saved to {filepath}")
     return filepath
 
-def validate_completeness(df, start_date, end_date):
-    from datetime import timedelta
+def save_to_parquet(df, filename='caiso_prices.parquet'):
+    """
+    Save DataFrame to Parquet file
+    """
+    # Create data directory if it doesn't exist
+    import os
+    os.makedirs('data', exist_ok=True)
+    
+    filepath = f'data/{filename}'
+    df.to_parquet(filepath, compression='snappy', engine='pyarrow', index=False)
+    print(f"Data saved to {filepath}")
+    return filepath
 
+def validate_completeness(df, start_date, end_date):
     lmp_data = df[df['LMP_TYPE'] == 'LMP'].copy()
 
     lmp_data['timestamp'] = pd.to_datetime(lmp_data['INTERVALSTARTTIME_GMT'])
-    lmp_data = lmp_data.sort_values('timestamp')
+    if not lmp_data['timestamp'].is_monotonic_increasing:
+        lmp_data = lmp_data.sort_values('timestamp', kind='mergesort')
 
     total_days = (end_date - start_date).days
     expected_hours = total_days*24
@@ -133,13 +181,14 @@ def validate_completeness(df, start_date, end_date):
     if actual_hours < expected_hours:
         print(f"\n Missing {expected_hours - actual_hours} hours of data")
 
-        lmp_data['time_diff'] = lmp_data['timestamp'].diff()
-        gaps = lmp_data[lmp_data['time_diff'] > timedelta(hours=1)]
+        # Diff the raw int64 nanoseconds instead of building a Timedelta column
+        ts = lmp_data['timestamp'].values.astype('datetime64[ns]').view('i8')
+        gap_idx = np.nonzero(np.diff(ts) > 3600 * 10**9)[0]
 
-        if len(gaps) > 0:
-            print(f"\nFound {len(gaps)} gap(s):")
-            for idx, row in gaps.iterrows():
-                print(f"  Gap detected at: {row['timestamp']}")
+        if len(gap_idx) > 0:
+            gaps = lmp_data['timestamp'].iloc[gap_idx + 1]
+            print(f"\nFound {len(gap_idx)} gap(s):")
+            print("\n".join(f"  Gap detected at: {gap}" for gap in gaps))
     else:
         print("\n Data is complete.")
 
@@ -192,4 +241,5 @@ if __name__ == "__main__":
         is_complete = validate_completeness(df, start_date, end_date)
 
         print(f"\nDataFrame shape: {df.shape}")
-        save_to_csv(df, 'caiso_prices_90days.csv')
\ No newline at end of file
+        save_to_csv(df, 'caiso_prices_90days.csv')
+        save_to_parquet(df, 'caiso_prices_90days.parquet')
\ No newline at end of file